@@ -1,31 +1,192 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Query
+from fastapi import FastAPI, APIRouter, BackgroundTasks, HTTPException, Query, Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from dotenv import load_dotenv
+from starlette.datastructures import Headers, MutableHeaders
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
+from fastapi_cache import FastAPICache, default_key_builder
+from fastapi_cache.backends.inmemory import InMemoryBackend
+from fastapi_cache.backends.redis import RedisBackend
+from fastapi_cache.decorator import cache
+from redis import asyncio as aioredis
+from redis.exceptions import RedisError
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError
+from async_lru import alru_cache
 import os
+import base64
+import hashlib
 import logging
 import asyncio
+from contextlib import asynccontextmanager
 from pathlib import Path
-from pydantic import BaseModel, Field, EmailStr
-from typing import List, Optional
+from pydantic import BaseModel, Field, EmailStr, field_validator
+from typing import List, Optional, Tuple
 import uuid
-from datetime import datetime, timezone
+import msgspec
+import orjson
+from datetime import datetime, timedelta, timezone
 import resend
+from jinja2 import Environment
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
+# Motor runs each Mongo operation on a thread from a pool sized by MOTOR_MAX_WORKERS,
+# read at import time, so this is the cap on operations in flight per process.
+# Default to Motor's own sizing (5 per CPU) explicitly; more workers help bursty
+# fan-out such as the dashboard gathers but add per-operation latency, so
+# benchmark before raising it.
+MOTOR_MAX_WORKERS = int(os.environ.setdefault('MOTOR_MAX_WORKERS', str((os.cpu_count() or 1) * 5)))
+from motor.motor_asyncio import AsyncIOMotorClient  # noqa: E402
+
+# MongoDB connection. A connection per worker thread is all that can ever be in
+# use, so the pool defaults to the worker cap.
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+MONGO_MAX_POOL_SIZE = int(os.environ.get('MONGO_MAX_POOL_SIZE', MOTOR_MAX_WORKERS))
+client = AsyncIOMotorClient(
+    mongo_url,
+    maxPoolSize=MONGO_MAX_POOL_SIZE,
+    minPoolSize=min(int(os.environ.get('MONGO_MIN_POOL_SIZE', '10')), MONGO_MAX_POOL_SIZE),
+    serverSelectionTimeoutMS=int(os.environ.get('MONGO_SERVER_SELECTION_TIMEOUT_MS', '3000'))
+)
 db = client[os.environ['DB_NAME']]
 
 # Resend configuration
 resend.api_key = os.environ.get('RESEND_API_KEY', '')
 SENDER_EMAIL = os.environ.get('SENDER_EMAIL', 'onboarding@resend.dev')
 
+# Response cache configuration (falls back to in-process memory without Redis)
+REDIS_URL = os.environ.get('REDIS_URL', '')
+CACHE_PREFIX = "lata"
+cache_redis = None
+
+# Indexes backing the id lookups and date/customer filters used by the routes
+async def create_indexes():
+    await asyncio.gather(
+        db.products.create_index("id", unique=True),
+        db.products.create_index(CREATED_ORDER),
+        db.customers.create_index("id", unique=True),
+        db.customers.create_index("is_active"),
+        db.customers.create_index(CREATED_ORDER),
+        db.daily_sales.create_index("id", unique=True),
+        db.daily_sales.create_index(DAILY_SALES_ORDER),
+        db.daily_sales.create_index([("customer_id", 1), ("date", 1)]),
+        db.guest_sales.create_index("id", unique=True),
+        db.guest_sales.create_index("date"),
+        db.guest_sales.create_index(GUEST_SALES_ORDER),
+        db.monthly_bills.create_index("id", unique=True),
+        db.monthly_bills.create_index([("year", 1), ("month", 1), *BILLS_ORDER]),
+        db.monthly_bills.create_index([("customer_id", 1), ("year", -1), ("month", -1)])
+    )
+
+# One-off migrations record completion in their own marker document, written
+# only after the data is in place, and hold a lease on it while they run so that
+# workers starting together don't race each other.
+MIGRATION_LEASE = timedelta(minutes=5)
+
+async def _acquire_migration(name: str) -> bool:
+    while True:
+        now = datetime.now(timezone.utc)
+        try:
+            marker = await db.migrations.find_one_and_update(
+                {"_id": name, "done": {"$ne": True}, "locked_until": {"$lt": now}},
+                {"$set": {"locked_until": now + MIGRATION_LEASE}, "$setOnInsert": {"done": False}},
+                upsert=True
+            )
+        except DuplicateKeyError:
+            # Either finished or leased by another worker; wait for it
+            marker = await db.migrations.find_one({"_id": name}, {"done": 1})
+            if marker and marker.get("done"):
+                return False
+            await asyncio.sleep(1)
+            continue
+        return True
+
+# One-time build of customers' monthly_totals (YYYY-MM -> total/count) from existing
+# sales; afterwards the sale write paths keep them current with $inc
+async def _monthly_totals(match: dict) -> dict:
+    # Group per day and fold into months here rather than slicing the date
+    # string in the pipeline; it runs once, so the extra rows don't matter.
+    rows = await db.daily_sales.aggregate([
+        {"$match": match},
+        {"$group": {
+            "_id": {"customer_id": "$customer_id", "date": "$date"},
+            "total": {"$sum": "$total_amount"},
+            "count": {"$sum": 1}
+        }}
+    ]).to_list(None)
+    
+    totals = {}
+    for row in rows:
+        key = (row["_id"]["customer_id"], row["_id"]["date"][:7])
+        month = totals.setdefault(key, {"total": 0, "count": 0})
+        month["total"] += row["total"]
+        month["count"] += row["count"]
+    return totals
+
+async def backfill_monthly_totals():
+    name = "monthly_totals_backfill"
+    if not await _acquire_migration(name):
+        return
+    
+    try:
+        # Workers on this version wait in startup until the marker is done, so
+        # none of them $inc these fields while they are being set. Workers still
+        # on the previous version keep inserting sales without touching them, so
+        # each pass re-totals every month that gained a sale since the previous
+        # pass began, until a pass finds none. Sales those workers write after the
+        # marker is done are never counted: stop them before this version first
+        # starts against a database without the marker.
+        match = {}
+        while True:
+            await db.migrations.update_one(
+                {"_id": name}, {"$set": {"locked_until": datetime.now(timezone.utc) + MIGRATION_LEASE}}
+            )
+            pass_started = _now_iso()
+            totals = await _monthly_totals(match)
+            if not totals:
+                break
+            operations = [
+                UpdateOne({"id": customer_id}, {"$set": {f"monthly_totals.{month_key}": month}})
+                for (customer_id, month_key), month in totals.items()
+            ]
+            await db.customers.bulk_write(operations, ordered=False)
+            
+            touched = await _monthly_totals({"created_at": {"$gte": pass_started}})
+            if not touched:
+                break
+            match = {"$or": [
+                {"customer_id": customer_id, "date": {"$gte": f"{month_key}-01", "$lte": f"{month_key}-31"}}
+                for customer_id, month_key in touched
+            ]}
+    except BaseException:
+        await db.migrations.update_one({"_id": name}, {"$set": {"locked_until": datetime.fromtimestamp(0, timezone.utc)}})
+        raise
+    
+    await db.migrations.update_one(
+        {"_id": name},
+        {"$set": {"done": True, "completed_at": _now_iso()}, "$unset": {"locked_until": ""}}
+    )
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global cache_redis
+    await create_indexes()
+    await backfill_monthly_totals()
+    cache_redis = aioredis.from_url(REDIS_URL) if REDIS_URL else None
+    backend = RedisBackend(cache_redis) if cache_redis is not None else InMemoryBackend()
+    FastAPICache.init(backend, prefix=CACHE_PREFIX, key_builder=versioned_key_builder)
+    yield
+    if cache_redis is not None:
+        await cache_redis.close()
+    client.close()
+
 # Create the main app
-app = FastAPI(title="Lata Dairy Management System")
+app = FastAPI(
+    title="Lata Dairy Management System",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
+)
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
@@ -36,16 +197,19 @@ logger = logging.getLogger(__name__)
 
 # ==================== MODELS ====================
 
+# Stored/returned documents are msgspec Structs; request bodies stay Pydantic
+# so FastAPI keeps validating input at the boundary.
+
 # Product Models
-class Product(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+class Product(msgspec.Struct, kw_only=True):
+    id: str = msgspec.field(default_factory=lambda: str(uuid.uuid4()))
     name: str
     category: str
     unit: str  # liter, kg, piece
     price: float
     description: Optional[str] = ""
     is_active: bool = True
-    created_at: str = Field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+    created_at: str = msgspec.field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
 
 class ProductCreate(BaseModel):
     name: str
@@ -63,8 +227,8 @@ class ProductUpdate(BaseModel):
     is_active: Optional[bool] = None
 
 # Customer Models
-class Customer(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+class Customer(msgspec.Struct, kw_only=True):
+    id: str = msgspec.field(default_factory=lambda: str(uuid.uuid4()))
     name: str
     phone: str
     address: str
@@ -72,7 +236,7 @@ class Customer(BaseModel):
     outstanding_balance: float = 0.0
     credit_limit: float = 5000.0
     is_active: bool = True
-    created_at: str = Field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+    created_at: str = msgspec.field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
 
 class CustomerCreate(BaseModel):
     name: str
@@ -90,7 +254,8 @@ class CustomerUpdate(BaseModel):
     is_active: Optional[bool] = None
 
 # Daily Sale Models
-class SaleItem(BaseModel):
+# Line items hold only scalars, so they can be frozen and skip GC tracking
+class SaleItem(msgspec.Struct, frozen=True, gc=False):
     product_id: str
     product_name: str
     quantity: float
@@ -98,8 +263,15 @@ class SaleItem(BaseModel):
     price: float
     total: float
 
-class DailySale(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+class SaleItemCreate(BaseModel):
+    product_id: str
+    product_name: str
+    quantity: float
+    unit: str
+    price: float
+
+class DailySale(msgspec.Struct, kw_only=True):
+    id: str = msgspec.field(default_factory=lambda: str(uuid.uuid4()))
     customer_id: str
     customer_name: str
     date: str  # YYYY-MM-DD format
@@ -107,29 +279,36 @@ class DailySale(BaseModel):
     total_amount: float
     paid_amount: float = 0.0
     is_paid: bool = False
-    created_at: str = Field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+    created_at: str = msgspec.field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
 
 class DailySaleCreate(BaseModel):
     customer_id: str
-    date: str
-    items: List[SaleItem]
+    # date[:7] becomes a monthly_totals field path, so only accept real YYYY-MM-DD dates
+    date: str = Field(pattern=r"^\d{4}-\d{2}-\d{2}$")
+    items: List[SaleItemCreate]
     paid_amount: float = 0.0
 
+    @field_validator("date")
+    @classmethod
+    def check_calendar_date(cls, value: str) -> str:
+        datetime.strptime(value, "%Y-%m-%d")
+        return value
+
 # Guest Sale Models
-class GuestSale(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+class GuestSale(msgspec.Struct, kw_only=True):
+    id: str = msgspec.field(default_factory=lambda: str(uuid.uuid4()))
     guest_name: Optional[str] = "Walk-in Customer"
     guest_phone: Optional[str] = ""
     date: str
     items: List[SaleItem]
     total_amount: float
     payment_method: str = "cash"
-    created_at: str = Field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+    created_at: str = msgspec.field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
 
 class GuestSaleCreate(BaseModel):
     guest_name: Optional[str] = "Walk-in Customer"
     guest_phone: Optional[str] = ""
-    items: List[SaleItem]
+    items: List[SaleItemCreate]
     payment_method: str = "cash"
 
 # Monthly Bill Models
@@ -156,29 +335,168 @@ class BillEmailRequest(BaseModel):
     bill_id: str
     recipient_email: EmailStr
 
+# ==================== HELPERS ====================
+
+_json_encoder = msgspec.json.Encoder()
+
+# Encodes Structs (and plain documents) with msgspec, skipping FastAPI's
+# response_model validation and jsonable_encoder pass
+class MsgspecJSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return _json_encoder.encode(content)
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+# Build stored documents in one pass instead of model -> dict round-trips
+def _new_product_doc(data: ProductCreate) -> dict:
+    return {"id": str(uuid.uuid4()), **data.model_dump(), "is_active": True, "created_at": _now_iso()}
+
+def _new_customer_doc(data: CustomerCreate) -> dict:
+    return {
+        "id": str(uuid.uuid4()),
+        **data.model_dump(),
+        "outstanding_balance": 0.0,
+        "is_active": True,
+        "created_at": _now_iso()
+    }
+
+# Customer reference data for the sale write path, served from memory for a minute.
+# Only id/name are cached; callers must treat the result as read-only.
+@alru_cache(maxsize=1024, ttl=60)
+async def get_customer_ref(customer_id: str):
+    return await db.customers.find_one({"id": customer_id}, {"_id": 0, "id": 1, "name": 1})
+
+# Line totals are always computed server-side from price and quantity
+def _priced_items(items: List[SaleItemCreate]):
+    docs = [{**item.model_dump(), "total": item.price * item.quantity} for item in items]
+    return docs, sum(doc["total"] for doc in docs)
+
+# Drop cached responses after a write that changes what they report
+# On Redis every namespace carries a generation counter that is part of each key;
+# invalidating bumps it instead of clearing, which would KEYS-scan the whole
+# server on every write. Orphaned entries simply run out their TTL.
+def _generation_key(namespace: str) -> str:
+    return f"{namespace}:generation"
+
+async def versioned_key_builder(func, namespace: str = "", *, request=None, response=None, args=(), kwargs=None):
+    if cache_redis is not None:
+        try:
+            generation = await cache_redis.get(_generation_key(namespace))
+        except RedisError as e:
+            # Same as fastapi-cache's own backend errors: log and serve uncached
+            logger.warning(f"Failed to read cache generation for {namespace}: {str(e)}")
+            generation = None
+        namespace = f"{namespace}:{int(generation or 0)}"
+    return default_key_builder(func, namespace, request=request, response=response, args=args, kwargs=kwargs or {})
+
+async def invalidate_cache(*namespaces: str):
+    if cache_redis is None:
+        # In-process cache: clearing is a local dict walk
+        await asyncio.gather(*(FastAPICache.clear(namespace=ns) for ns in namespaces))
+        return
+    # Best-effort: the write has already landed, so a cache outage must not fail it
+    try:
+        await asyncio.gather(*(cache_redis.incr(_generation_key(f"{CACHE_PREFIX}:{ns}")) for ns in namespaces))
+    except RedisError as e:
+        logger.warning(f"Failed to invalidate cache namespaces {namespaces}: {str(e)}")
+
+def _daily_sales_query(customer_id: Optional[str], date: Optional[str],
+                       start_date: Optional[str], end_date: Optional[str]) -> dict:
+    query = {}
+    if customer_id:
+        query["customer_id"] = customer_id
+    if date:
+        query["date"] = date
+    if start_date and end_date:
+        query["date"] = {"$gte": start_date, "$lte": end_date}
+    return query
+
+# Sum total_amount and count matching sales inside Mongo instead of pulling documents
+async def _sales_totals(collection, match: dict):
+    result = await collection.aggregate([
+        {"$match": match},
+        {"$group": {"_id": None, "revenue": {"$sum": "$total_amount"}, "count": {"$sum": 1}}}
+    ]).to_list(1)
+    if not result:
+        return 0, 0
+    return result[0]["revenue"], result[0]["count"]
+
+# List orderings used for keyset pagination. Each ends with the unique "id" so the
+# key is total, and each is backed by a matching index in create_indexes.
+CREATED_ORDER = [("created_at", 1), ("id", 1)]
+DAILY_SALES_ORDER = [("date", -1), ("created_at", -1), ("id", -1)]
+GUEST_SALES_ORDER = [("created_at", -1), ("id", -1)]
+BILLS_ORDER = [("customer_name", 1), ("id", 1)]
+
+def _encode_cursor(values: list) -> str:
+    return base64.urlsafe_b64encode(orjson.dumps(values)).decode()
+
+def _decode_cursor(cursor: str, size: int) -> list:
+    try:
+        values = orjson.loads(base64.urlsafe_b64decode(cursor))
+    except ValueError:
+        values = None
+    # Values go straight into the filter, so only plain scalars (no operator dicts)
+    if (not isinstance(values, list) or len(values) != size
+            or not all(isinstance(v, (str, int, float)) for v in values)):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+# Rows strictly after `values` in `order`: (a, b) > (x, y) is a > x or (a == x and b > y)
+def _after_clauses(order: List[Tuple[str, int]], values: list) -> List[dict]:
+    clauses = []
+    for i, (field, direction) in enumerate(order):
+        clause = {name: value for (name, _), value in zip(order[:i], values)}
+        clause[field] = {"$gt" if direction == 1 else "$lt": values[i]}
+        clauses.append(clause)
+    return clauses
+
+# Keyset pagination: the cursor holds the sort-key values of the last row served.
+# One extra row is read so next_cursor is None exactly when this is the last page.
+async def _paginate(collection, query: dict, order: List[Tuple[str, int]], limit: int,
+                    after: Optional[str], projection: Optional[dict] = None):
+    if after:
+        query = {**query, "$or": _after_clauses(order, _decode_cursor(after, len(order)))}
+    docs = await collection.find(query, projection or {"_id": 0}).sort(order).limit(limit + 1).to_list(limit + 1)
+    if len(docs) <= limit:
+        return docs, None
+    docs = docs[:limit]
+    return docs, _encode_cursor([docs[-1][field] for field, _ in order])
+
 # ==================== PRODUCT ROUTES ====================
 
-@api_router.get("/products", response_model=List[Product])
-async def get_products(active_only: bool = False):
+@api_router.get("/products", response_class=MsgspecJSONResponse)
+async def get_products(
+    active_only: bool = False,
+    limit: int = Query(100, ge=1, le=1000),
+    after: Optional[str] = None
+):
     query = {"is_active": True} if active_only else {}
-    products = await db.products.find(query, {"_id": 0}).to_list(1000)
-    return products
+    products, next_cursor = await _paginate(db.products, query, CREATED_ORDER, limit, after)
+    return MsgspecJSONResponse({
+        "items": msgspec.convert(products, List[Product]),
+        "next_cursor": next_cursor
+    })
 
-@api_router.get("/products/{product_id}", response_model=Product)
+@api_router.get("/products/{product_id}", response_class=MsgspecJSONResponse)
 async def get_product(product_id: str):
     product = await db.products.find_one({"id": product_id}, {"_id": 0})
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
-    return product
+    return MsgspecJSONResponse(msgspec.convert(product, Product))
 
-@api_router.post("/products", response_model=Product)
+@api_router.post("/products", response_class=MsgspecJSONResponse)
 async def create_product(data: ProductCreate):
-    product = Product(**data.model_dump())
-    doc = product.model_dump()
+    doc = _new_product_doc(data)
     await db.products.insert_one(doc)
-    return product
+    doc.pop("_id")  # added by insert_one
+    await invalidate_cache("products", "dashboard")
+    return MsgspecJSONResponse(doc)
 
-@api_router.put("/products/{product_id}", response_model=Product)
+@api_router.put("/products/{product_id}", response_class=MsgspecJSONResponse)
 async def update_product(product_id: str, data: ProductUpdate):
     update_data = {k: v for k, v in data.model_dump().items() if v is not None}
     if not update_data:
@@ -186,44 +504,55 @@ async def update_product(product_id: str, data: ProductUpdate):
     result = await db.products.update_one({"id": product_id}, {"$set": update_data})
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Product not found")
+    await invalidate_cache("products", "dashboard")
     product = await db.products.find_one({"id": product_id}, {"_id": 0})
-    return product
+    return MsgspecJSONResponse(msgspec.convert(product, Product))
 
 @api_router.delete("/products/{product_id}")
 async def delete_product(product_id: str):
     result = await db.products.delete_one({"id": product_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Product not found")
+    await invalidate_cache("products", "dashboard")
     return {"message": "Product deleted successfully"}
 
 @api_router.get("/product-categories")
+@cache(expire=300, namespace="products")
 async def get_product_categories():
     categories = await db.products.distinct("category")
     return categories
 
 # ==================== CUSTOMER ROUTES ====================
 
-@api_router.get("/customers", response_model=List[Customer])
-async def get_customers(active_only: bool = False):
+@api_router.get("/customers", response_class=MsgspecJSONResponse)
+async def get_customers(
+    active_only: bool = False,
+    limit: int = Query(100, ge=1, le=1000),
+    after: Optional[str] = None
+):
     query = {"is_active": True} if active_only else {}
-    customers = await db.customers.find(query, {"_id": 0}).to_list(1000)
-    return customers
+    customers, next_cursor = await _paginate(db.customers, query, CREATED_ORDER, limit, after)
+    return MsgspecJSONResponse({
+        "items": msgspec.convert(customers, List[Customer]),
+        "next_cursor": next_cursor
+    })
 
-@api_router.get("/customers/{customer_id}", response_model=Customer)
+@api_router.get("/customers/{customer_id}", response_class=MsgspecJSONResponse)
 async def get_customer(customer_id: str):
     customer = await db.customers.find_one({"id": customer_id}, {"_id": 0})
     if not customer:
         raise HTTPException(status_code=404, detail="Customer not found")
-    return customer
+    return MsgspecJSONResponse(msgspec.convert(customer, Customer))
 
-@api_router.post("/customers", response_model=Customer)
+@api_router.post("/customers", response_class=MsgspecJSONResponse)
 async def create_customer(data: CustomerCreate):
-    customer = Customer(**data.model_dump())
-    doc = customer.model_dump()
+    doc = _new_customer_doc(data)
     await db.customers.insert_one(doc)
-    return customer
+    doc.pop("_id")  # added by insert_one
+    await invalidate_cache("dashboard")
+    return MsgspecJSONResponse(doc)
 
-@api_router.put("/customers/{customer_id}", response_model=Customer)
+@api_router.put("/customers/{customer_id}", response_class=MsgspecJSONResponse)
 async def update_customer(customer_id: str, data: CustomerUpdate):
     update_data = {k: v for k, v in data.model_dump().items() if v is not None}
     if not update_data:
@@ -231,72 +560,108 @@ async def update_customer(customer_id: str, data: CustomerUpdate):
     result = await db.customers.update_one({"id": customer_id}, {"$set": update_data})
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Customer not found")
+    get_customer_ref.cache_invalidate(customer_id)
+    await invalidate_cache("dashboard")
     customer = await db.customers.find_one({"id": customer_id}, {"_id": 0})
-    return customer
+    return MsgspecJSONResponse(msgspec.convert(customer, Customer))
 
 @api_router.delete("/customers/{customer_id}")
 async def delete_customer(customer_id: str):
     result = await db.customers.delete_one({"id": customer_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Customer not found")
+    get_customer_ref.cache_invalidate(customer_id)
+    await invalidate_cache("dashboard")
     return {"message": "Customer deleted successfully"}
 
 # ==================== DAILY SALES ROUTES ====================
 
-@api_router.get("/daily-sales", response_model=List[DailySale])
+@api_router.get("/daily-sales", response_class=MsgspecJSONResponse)
 async def get_daily_sales(
+    customer_id: Optional[str] = None,
+    date: Optional[str] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    include_items: bool = True,
+    limit: int = Query(100, ge=1, le=1000),
+    after: Optional[str] = None
+):
+    query = _daily_sales_query(customer_id, date, start_date, end_date)
+    if not include_items:
+        # Summary rows only; skip line items on the wire and in the response
+        sales, next_cursor = await _paginate(
+            db.daily_sales, query, DAILY_SALES_ORDER, limit, after, {"_id": 0, "items": 0}
+        )
+        return MsgspecJSONResponse({"items": sales, "next_cursor": next_cursor})
+    sales, next_cursor = await _paginate(db.daily_sales, query, DAILY_SALES_ORDER, limit, after)
+    return MsgspecJSONResponse({
+        "items": msgspec.convert(sales, List[DailySale]),
+        "next_cursor": next_cursor
+    })
+
+@api_router.get("/daily-sales/export")
+async def export_daily_sales(
     customer_id: Optional[str] = None,
     date: Optional[str] = None,
     start_date: Optional[str] = None,
     end_date: Optional[str] = None
 ):
-    query = {}
-    if customer_id:
-        query["customer_id"] = customer_id
-    if date:
-        query["date"] = date
-    if start_date and end_date:
-        query["date"] = {"$gte": start_date, "$lte": end_date}
-    sales = await db.daily_sales.find(query, {"_id": 0}).sort("date", -1).to_list(1000)
-    return sales
+    query = _daily_sales_query(customer_id, date, start_date, end_date)
+    cursor = db.daily_sales.find(query, {"_id": 0}).sort("date", 1)
+    
+    # Stream one JSON document per line straight from the cursor
+    async def generate():
+        async for sale in cursor:
+            yield orjson.dumps(sale) + b"\n"
+    
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
 
-@api_router.get("/daily-sales/{sale_id}", response_model=DailySale)
+@api_router.get("/daily-sales/{sale_id}", response_class=MsgspecJSONResponse)
 async def get_daily_sale(sale_id: str):
     sale = await db.daily_sales.find_one({"id": sale_id}, {"_id": 0})
     if not sale:
         raise HTTPException(status_code=404, detail="Sale not found")
-    return sale
+    return MsgspecJSONResponse(msgspec.convert(sale, DailySale))
 
-@api_router.post("/daily-sales", response_model=DailySale)
+@api_router.post("/daily-sales", response_class=MsgspecJSONResponse)
 async def create_daily_sale(data: DailySaleCreate):
     # Get customer details
-    customer = await db.customers.find_one({"id": data.customer_id}, {"_id": 0})
+    customer = await get_customer_ref(data.customer_id)
     if not customer:
         raise HTTPException(status_code=404, detail="Customer not found")
     
     # Calculate total
-    total_amount = sum(item.total for item in data.items)
-    
-    sale = DailySale(
-        customer_id=data.customer_id,
-        customer_name=customer["name"],
-        date=data.date,
-        items=data.items,
-        total_amount=total_amount,
-        paid_amount=data.paid_amount,
-        is_paid=data.paid_amount >= total_amount
-    )
+    items, total_amount = _priced_items(data.items)
+    
+    doc = {
+        "id": str(uuid.uuid4()),
+        "customer_id": data.customer_id,
+        "customer_name": customer["name"],
+        "date": data.date,
+        "items": items,
+        "total_amount": total_amount,
+        "paid_amount": data.paid_amount,
+        "is_paid": data.paid_amount >= total_amount,
+        "created_at": _now_iso()
+    }
     
-    # Update customer balance
+    # Update customer balance and monthly totals, and store the sale, concurrently
     balance_change = total_amount - data.paid_amount
-    await db.customers.update_one(
-        {"id": data.customer_id},
-        {"$inc": {"outstanding_balance": balance_change}}
+    month_key = data.date[:7]
+    await asyncio.gather(
+        db.customers.update_one(
+            {"id": data.customer_id},
+            {"$inc": {
+                "outstanding_balance": balance_change,
+                f"monthly_totals.{month_key}.total": total_amount,
+                f"monthly_totals.{month_key}.count": 1
+            }}
+        ),
+        db.daily_sales.insert_one(doc)
     )
-    
-    doc = sale.model_dump()
-    await db.daily_sales.insert_one(doc)
-    return sale
+    doc.pop("_id")  # added by insert_one
+    await invalidate_cache("dashboard")
+    return MsgspecJSONResponse(doc)
 
 @api_router.put("/daily-sales/{sale_id}/payment")
 async def update_sale_payment(sale_id: str, paid_amount: float):
@@ -310,16 +675,18 @@ async def update_sale_payment(sale_id: str, paid_amount: float):
     
     is_paid = new_paid >= sale["total_amount"]
     
-    await db.daily_sales.update_one(
-        {"id": sale_id},
-        {"$set": {"paid_amount": new_paid, "is_paid": is_paid}}
-    )
-    
-    await db.customers.update_one(
-        {"id": sale["customer_id"]},
-        {"$inc": {"outstanding_balance": balance_change}}
+    await asyncio.gather(
+        db.daily_sales.update_one(
+            {"id": sale_id},
+            {"$set": {"paid_amount": new_paid, "is_paid": is_paid}}
+        ),
+        db.customers.update_one(
+            {"id": sale["customer_id"]},
+            {"$inc": {"outstanding_balance": balance_change}}
+        )
     )
     
+    await invalidate_cache("dashboard")
     return {"message": "Payment updated successfully"}
 
 @api_router.delete("/daily-sales/{sale_id}")
@@ -328,50 +695,72 @@ async def delete_daily_sale(sale_id: str):
     if not sale:
         raise HTTPException(status_code=404, detail="Sale not found")
     
-    # Revert customer balance
+    # Revert customer balance and monthly totals while removing the sale
     balance_change = -(sale["total_amount"] - sale.get("paid_amount", 0))
-    await db.customers.update_one(
-        {"id": sale["customer_id"]},
-        {"$inc": {"outstanding_balance": balance_change}}
+    month_key = sale["date"][:7]
+    await asyncio.gather(
+        db.customers.update_one(
+            {"id": sale["customer_id"]},
+            {"$inc": {
+                "outstanding_balance": balance_change,
+                f"monthly_totals.{month_key}.total": -sale["total_amount"],
+                f"monthly_totals.{month_key}.count": -1
+            }}
+        ),
+        db.daily_sales.delete_one({"id": sale_id})
     )
-    
-    await db.daily_sales.delete_one({"id": sale_id})
+    await invalidate_cache("dashboard")
     return {"message": "Sale deleted successfully"}
 
 # ==================== GUEST SALES ROUTES ====================
 
-@api_router.get("/guest-sales", response_model=List[GuestSale])
-async def get_guest_sales(date: Optional[str] = None):
+@api_router.get("/guest-sales", response_class=MsgspecJSONResponse)
+async def get_guest_sales(
+    date: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    after: Optional[str] = None
+):
     query = {"date": date} if date else {}
-    sales = await db.guest_sales.find(query, {"_id": 0}).sort("created_at", -1).to_list(1000)
-    return sales
+    sales, next_cursor = await _paginate(db.guest_sales, query, GUEST_SALES_ORDER, limit, after)
+    return MsgspecJSONResponse({
+        "items": msgspec.convert(sales, List[GuestSale]),
+        "next_cursor": next_cursor
+    })
 
-@api_router.post("/guest-sales", response_model=GuestSale)
+@api_router.post("/guest-sales", response_class=MsgspecJSONResponse)
 async def create_guest_sale(data: GuestSaleCreate):
-    total_amount = sum(item.total for item in data.items)
-    today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
-    
-    sale = GuestSale(
-        guest_name=data.guest_name,
-        guest_phone=data.guest_phone,
-        date=today,
-        items=data.items,
-        total_amount=total_amount,
-        payment_method=data.payment_method
-    )
+    items, total_amount = _priced_items(data.items)
+    now = datetime.now(timezone.utc)
+    
+    doc = {
+        "id": str(uuid.uuid4()),
+        "guest_name": data.guest_name,
+        "guest_phone": data.guest_phone,
+        "date": now.strftime("%Y-%m-%d"),
+        "items": items,
+        "total_amount": total_amount,
+        "payment_method": data.payment_method,
+        "created_at": now.isoformat()
+    }
     
-    doc = sale.model_dump()
     await db.guest_sales.insert_one(doc)
-    return sale
+    doc.pop("_id")  # added by insert_one
+    await invalidate_cache("dashboard")
+    return MsgspecJSONResponse(doc)
 
 # ==================== BILLING ROUTES ====================
 
 @api_router.get("/billing/monthly")
-async def get_monthly_bills(month: int, year: int):
-    bills = await db.monthly_bills.find(
-        {"month": month, "year": year}, {"_id": 0}
-    ).to_list(1000)
-    return bills
+async def get_monthly_bills(
+    month: int,
+    year: int,
+    limit: int = Query(100, ge=1, le=1000),
+    after: Optional[str] = None
+):
+    bills, next_cursor = await _paginate(
+        db.monthly_bills, {"month": month, "year": year}, BILLS_ORDER, limit, after
+    )
+    return {"items": bills, "next_cursor": next_cursor}
 
 @api_router.get("/billing/customer/{customer_id}")
 async def get_customer_bills(customer_id: str):
@@ -382,9 +771,6 @@ async def get_customer_bills(customer_id: str):
 
 @api_router.post("/billing/generate")
 async def generate_monthly_bills(month: int, year: int):
-    # Get all active customers
-    customers = await db.customers.find({"is_active": True}, {"_id": 0}).to_list(1000)
-    
     # Date range for the month
     start_date = f"{year}-{month:02d}-01"
     if month == 12:
@@ -392,52 +778,58 @@ async def generate_monthly_bills(month: int, year: int):
     else:
         end_date = f"{year}-{month + 1:02d}-01"
     
+    # Active customers, per-customer sales totals for the month and existing bill ids
+    customers, totals, existing_bills = await asyncio.gather(
+        db.customers.find({"is_active": True}, {"_id": 0, "id": 1, "name": 1}).to_list(None),
+        db.daily_sales.aggregate([
+            {"$match": {"date": {"$gte": start_date, "$lt": end_date}}},
+            {"$group": {
+                "_id": "$customer_id",
+                "total_sales": {"$sum": "$total_amount"},
+                "total_paid": {"$sum": "$paid_amount"},
+                "sales_count": {"$sum": 1}
+            }}
+        ]).to_list(None),
+        db.monthly_bills.find(
+            {"month": month, "year": year}, {"_id": 0, "customer_id": 1, "id": 1}
+        ).to_list(None)
+    )
+    
+    customer_names = {c["id"]: c["name"] for c in customers}
+    existing_ids = {b["customer_id"]: b.get("id") for b in existing_bills}
+    
+    generated_at = _now_iso()
     bills_generated = []
+    operations = []
     
-    for customer in customers:
-        # Get sales for this customer in this month
-        sales = await db.daily_sales.find({
-            "customer_id": customer["id"],
-            "date": {"$gte": start_date, "$lt": end_date}
-        }, {"_id": 0}).to_list(1000)
-        
-        if not sales:
+    for row in totals:
+        customer_id = row["_id"]
+        if customer_id not in customer_names:
             continue
         
-        total_sales = sum(s["total_amount"] for s in sales)
-        total_paid = sum(s.get("paid_amount", 0) for s in sales)
-        
-        # Check if bill already exists
-        existing = await db.monthly_bills.find_one({
-            "customer_id": customer["id"],
-            "month": month,
-            "year": year
-        })
-        
         bill_data = {
-            "customer_id": customer["id"],
-            "customer_name": customer["name"],
+            "customer_id": customer_id,
+            "customer_name": customer_names[customer_id],
             "month": month,
             "year": year,
-            "total_sales": total_sales,
-            "total_paid": total_paid,
-            "balance_due": total_sales - total_paid,
-            "sales_count": len(sales),
-            "generated_at": datetime.now(timezone.utc).isoformat(),
+            "total_sales": row["total_sales"],
+            "total_paid": row["total_paid"],
+            "balance_due": row["total_sales"] - row["total_paid"],
+            "sales_count": row["sales_count"],
+            "generated_at": generated_at,
             "email_sent": False
         }
+        bill_id = existing_ids.get(customer_id) or str(uuid.uuid4())
         
-        if existing:
-            await db.monthly_bills.update_one(
-                {"customer_id": customer["id"], "month": month, "year": year},
-                {"$set": bill_data}
-            )
-            bill_data["id"] = existing.get("id", str(uuid.uuid4()))
-        else:
-            bill_data["id"] = str(uuid.uuid4())
-            await db.monthly_bills.insert_one(bill_data)
-        
-        bills_generated.append(bill_data)
+        operations.append(UpdateOne(
+            {"customer_id": customer_id, "month": month, "year": year},
+            {"$set": bill_data, "$setOnInsert": {"id": bill_id}},
+            upsert=True
+        ))
+        bills_generated.append({**bill_data, "id": bill_id})
+    
+    if operations:
+        await db.monthly_bills.bulk_write(operations, ordered=False)
     
     return {"message": f"Generated {len(bills_generated)} bills", "bills": bills_generated}
 
@@ -464,41 +856,46 @@ async def get_bill_details(bill_id: str):
 # ==================== DASHBOARD ROUTES ====================
 
 @api_router.get("/dashboard/stats")
+@cache(expire=30, namespace="dashboard")
 async def get_dashboard_stats():
-    today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
-    current_month = datetime.now(timezone.utc).month
-    current_year = datetime.now(timezone.utc).year
+    now = datetime.now(timezone.utc)
+    today = now.strftime("%Y-%m-%d")
+    current_month = now.month
+    current_year = now.year
     
-    # Today's stats
-    today_sales = await db.daily_sales.find({"date": today}, {"_id": 0}).to_list(1000)
-    today_guest_sales = await db.guest_sales.find({"date": today}, {"_id": 0}).to_list(1000)
-    
-    today_revenue = sum(s["total_amount"] for s in today_sales) + sum(s["total_amount"] for s in today_guest_sales)
-    today_transactions = len(today_sales) + len(today_guest_sales)
-    
-    # Monthly stats
+    # Monthly date range
     start_date = f"{current_year}-{current_month:02d}-01"
     if current_month == 12:
         end_date = f"{current_year + 1}-01-01"
     else:
         end_date = f"{current_year}-{current_month + 1:02d}-01"
+    month_match = {"date": {"$gte": start_date, "$lt": end_date}}
     
-    month_sales = await db.daily_sales.find({
-        "date": {"$gte": start_date, "$lt": end_date}
-    }, {"_id": 0}).to_list(10000)
-    month_guest_sales = await db.guest_sales.find({
-        "date": {"$gte": start_date, "$lt": end_date}
-    }, {"_id": 0}).to_list(10000)
-    
-    month_revenue = sum(s["total_amount"] for s in month_sales) + sum(s["total_amount"] for s in month_guest_sales)
-    
-    # Outstanding balance
-    customers = await db.customers.find({}, {"_id": 0}).to_list(1000)
-    total_outstanding = sum(c.get("outstanding_balance", 0) for c in customers)
+    # Run all aggregations concurrently; only scalars come back from Mongo
+    (
+        (today_daily_revenue, today_daily_count),
+        (today_guest_revenue, today_guest_count),
+        (month_daily_revenue, month_daily_count),
+        (month_guest_revenue, month_guest_count),
+        outstanding,
+        total_customers,
+        total_products
+    ) = await asyncio.gather(
+        _sales_totals(db.daily_sales, {"date": today}),
+        _sales_totals(db.guest_sales, {"date": today}),
+        _sales_totals(db.daily_sales, month_match),
+        _sales_totals(db.guest_sales, month_match),
+        db.customers.aggregate([
+            {"$group": {"_id": None, "total": {"$sum": "$outstanding_balance"}}}
+        ]).to_list(1),
+        db.customers.count_documents({"is_active": True}),
+        db.products.count_documents({"is_active": True})
+    )
     
-    # Counts
-    total_customers = await db.customers.count_documents({"is_active": True})
-    total_products = await db.products.count_documents({"is_active": True})
+    today_revenue = today_daily_revenue + today_guest_revenue
+    today_transactions = today_daily_count + today_guest_count
+    month_revenue = month_daily_revenue + month_guest_revenue
+    total_outstanding = outstanding[0]["total"] if outstanding else 0
     
     return {
         "today_revenue": today_revenue,
@@ -507,32 +904,48 @@ async def get_dashboard_stats():
         "total_outstanding": total_outstanding,
         "total_customers": total_customers,
         "total_products": total_products,
-        "month_sales_count": len(month_sales) + len(month_guest_sales)
+        "month_sales_count": month_daily_count + month_guest_count
     }
 
 @api_router.get("/dashboard/sales-chart")
+@cache(expire=60, namespace="dashboard")
 async def get_sales_chart(days: int = 7):
-    from datetime import timedelta
     
     end_date = datetime.now(timezone.utc)
     start_date = end_date - timedelta(days=days)
     
+    date_match = {"date": {
+        "$gte": start_date.strftime("%Y-%m-%d"),
+        "$lte": end_date.strftime("%Y-%m-%d")
+    }}
+    group_by_date = {"$group": {
+        "_id": "$date",
+        "revenue": {"$sum": "$total_amount"},
+        "count": {"$sum": 1}
+    }}
+    
+    daily, guest = await asyncio.gather(
+        db.daily_sales.aggregate([{"$match": date_match}, group_by_date]).to_list(None),
+        db.guest_sales.aggregate([{"$match": date_match}, group_by_date]).to_list(None)
+    )
+    
+    totals = {}
+    for row in daily + guest:
+        revenue, count = totals.get(row["_id"], (0, 0))
+        totals[row["_id"]] = (revenue + row["revenue"], count + row["count"])
+    
     chart_data = []
     current = start_date
     
     while current <= end_date:
         date_str = current.strftime("%Y-%m-%d")
-        
-        daily = await db.daily_sales.find({"date": date_str}, {"_id": 0}).to_list(1000)
-        guest = await db.guest_sales.find({"date": date_str}, {"_id": 0}).to_list(1000)
-        
-        revenue = sum(s["total_amount"] for s in daily) + sum(s["total_amount"] for s in guest)
+        revenue, transactions = totals.get(date_str, (0, 0))
         
         chart_data.append({
             "date": date_str,
             "day": current.strftime("%a"),
             "revenue": revenue,
-            "transactions": len(daily) + len(guest)
+            "transactions": transactions
         })
         
         current += timedelta(days=1)
@@ -540,38 +953,29 @@ async def get_sales_chart(days: int = 7):
     return chart_data
 
 @api_router.get("/dashboard/top-customers")
+@cache(expire=60, namespace="dashboard")
 async def get_top_customers(limit: int = 5):
-    # Get customers with highest purchases this month
-    current_month = datetime.now(timezone.utc).month
-    current_year = datetime.now(timezone.utc).year
+    # Read the per-month totals kept on each customer instead of scanning sales
+    now = datetime.now(timezone.utc)
+    month_key = f"{now.year}-{now.month:02d}"
+    totals_field = f"monthly_totals.{month_key}"
     
-    start_date = f"{current_year}-{current_month:02d}-01"
-    if current_month == 12:
-        end_date = f"{current_year + 1}-01-01"
-    else:
-        end_date = f"{current_year}-{current_month + 1:02d}-01"
+    customers = await db.customers.find(
+        {f"{totals_field}.count": {"$gt": 0}},
+        {"_id": 0, "id": 1, "name": 1, totals_field: 1}
+    ).sort(f"{totals_field}.total", -1).limit(limit).to_list(limit)
     
-    pipeline = [
-        {"$match": {"date": {"$gte": start_date, "$lt": end_date}}},
-        {"$group": {
-            "_id": "$customer_id",
-            "customer_name": {"$first": "$customer_name"},
-            "total_purchases": {"$sum": "$total_amount"},
-            "purchase_count": {"$sum": 1}
-        }},
-        {"$sort": {"total_purchases": -1}},
-        {"$limit": limit}
-    ]
-    
-    results = await db.daily_sales.aggregate(pipeline).to_list(limit)
-    return [{"customer_id": r["_id"], "customer_name": r["customer_name"], 
-             "total_purchases": r["total_purchases"], "purchase_count": r["purchase_count"]} 
-            for r in results]
+    return [{"customer_id": c["id"], "customer_name": c["name"],
+             "total_purchases": c["monthly_totals"][month_key]["total"],
+             "purchase_count": c["monthly_totals"][month_key]["count"]}
+            for c in customers]
 
 @api_router.get("/dashboard/top-products")
+@cache(expire=60, namespace="dashboard")
 async def get_top_products(limit: int = 5):
-    current_month = datetime.now(timezone.utc).month
-    current_year = datetime.now(timezone.utc).year
+    now = datetime.now(timezone.utc)
+    current_month = now.month
+    current_year = now.year
     
     start_date = f"{current_year}-{current_month:02d}-01"
     if current_month == 12:
@@ -592,15 +996,29 @@ async def get_top_products(limit: int = 5):
         {"$limit": limit}
     ]
     
-    results = await db.daily_sales.aggregate(pipeline).to_list(limit)
+    results = await db.daily_sales.aggregate(pipeline, allowDiskUse=False).to_list(limit)
     return [{"product_id": r["_id"], "product_name": r["product_name"],
              "total_quantity": r["total_quantity"], "total_revenue": r["total_revenue"]}
             for r in results]
 
 # ==================== EMAIL ROUTES ====================
 
-@api_router.post("/send-email")
-async def send_email(request: EmailRequest):
+# Runs after the response is sent; a bill is only marked as emailed once Resend accepts it
+async def deliver_email(params: dict, bill_id: Optional[str] = None):
+    try:
+        await asyncio.to_thread(resend.Emails.send, params)
+    except Exception as e:
+        logger.error(f"Failed to send email to {params['to'][0]}: {str(e)}")
+        return
+    
+    if bill_id:
+        await db.monthly_bills.update_one(
+            {"id": bill_id},
+            {"$set": {"email_sent": True}}
+        )
+
+@api_router.post("/send-email", status_code=202)
+async def send_email(request: EmailRequest, background_tasks: BackgroundTasks):
     if not resend.api_key:
         raise HTTPException(status_code=500, detail="Email service not configured")
     
@@ -611,30 +1029,17 @@ async def send_email(request: EmailRequest):
         "html": request.html_content
     }
     
-    try:
-        email = await asyncio.to_thread(resend.Emails.send, params)
-        return {
-            "status": "success",
-            "message": f"Email sent to {request.recipient_email}",
-            "email_id": email.get("id")
-        }
-    except Exception as e:
-        logger.error(f"Failed to send email: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Failed to send email: {str(e)}")
+    background_tasks.add_task(deliver_email, params)
+    return {
+        "status": "queued",
+        "message": f"Email to {request.recipient_email} queued for delivery"
+    }
 
-@api_router.post("/billing/send-email")
-async def send_bill_email(request: BillEmailRequest):
-    # Get bill details
-    bill = await db.monthly_bills.find_one({"id": request.bill_id}, {"_id": 0})
-    if not bill:
-        raise HTTPException(status_code=404, detail="Bill not found")
-    
-    # Generate HTML content
-    month_names = ["", "January", "February", "March", "April", "May", "June",
-                   "July", "August", "September", "October", "November", "December"]
-    month_name = month_names[bill["month"]]
-    
-    html_content = f"""
+MONTH_NAMES = ("", "January", "February", "March", "April", "May", "June",
+               "July", "August", "September", "October", "November", "December")
+
+# Compiled once at import; each bill email is just a render
+BILL_EMAIL_TEMPLATE = Environment(autoescape=True).from_string("""
     <div style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto; padding: 20px;">
         <div style="background: #1e3a8a; color: white; padding: 20px; text-align: center;">
             <h1 style="margin: 0;">Lata Dairy</h1>
@@ -642,25 +1047,25 @@ async def send_bill_email(request: BillEmailRequest):
         </div>
         
         <div style="padding: 20px; background: #fdfbf7;">
-            <p>Dear <strong>{bill['customer_name']}</strong>,</p>
-            <p>Please find below your bill statement for <strong>{month_name} {bill['year']}</strong>.</p>
+            <p>Dear <strong>{{ bill.customer_name }}</strong>,</p>
+            <p>Please find below your bill statement for <strong>{{ month_name }} {{ bill.year }}</strong>.</p>
             
             <table style="width: 100%; border-collapse: collapse; margin: 20px 0;">
                 <tr style="background: #f5f5f4;">
                     <td style="padding: 10px; border: 1px solid #e7e5e4;"><strong>Total Purchases</strong></td>
-                    <td style="padding: 10px; border: 1px solid #e7e5e4; text-align: right;">₹{bill['total_sales']:.2f}</td>
+                    <td style="padding: 10px; border: 1px solid #e7e5e4; text-align: right;">₹{{ "%.2f"|format(bill.total_sales) }}</td>
                 </tr>
                 <tr>
                     <td style="padding: 10px; border: 1px solid #e7e5e4;"><strong>Amount Paid</strong></td>
-                    <td style="padding: 10px; border: 1px solid #e7e5e4; text-align: right;">₹{bill['total_paid']:.2f}</td>
+                    <td style="padding: 10px; border: 1px solid #e7e5e4; text-align: right;">₹{{ "%.2f"|format(bill.total_paid) }}</td>
                 </tr>
                 <tr style="background: #fef2f2;">
                     <td style="padding: 10px; border: 1px solid #e7e5e4;"><strong>Balance Due</strong></td>
-                    <td style="padding: 10px; border: 1px solid #e7e5e4; text-align: right; color: #dc2626;"><strong>₹{bill['balance_due']:.2f}</strong></td>
+                    <td style="padding: 10px; border: 1px solid #e7e5e4; text-align: right; color: #dc2626;"><strong>₹{{ "%.2f"|format(bill.balance_due) }}</strong></td>
                 </tr>
                 <tr>
                     <td style="padding: 10px; border: 1px solid #e7e5e4;"><strong>Number of Transactions</strong></td>
-                    <td style="padding: 10px; border: 1px solid #e7e5e4; text-align: right;">{bill['sales_count']}</td>
+                    <td style="padding: 10px; border: 1px solid #e7e5e4; text-align: right;">{{ bill.sales_count }}</td>
                 </tr>
             </table>
             
@@ -669,10 +1074,21 @@ async def send_bill_email(request: BillEmailRequest):
         </div>
         
         <div style="background: #1c1917; color: white; padding: 15px; text-align: center; font-size: 12px;">
-            <p style="margin: 0;">© {bill['year']} Lata Dairy. All rights reserved.</p>
+            <p style="margin: 0;">© {{ bill.year }} Lata Dairy. All rights reserved.</p>
         </div>
     </div>
-    """
+    """)
+
+@api_router.post("/billing/send-email", status_code=202)
+async def send_bill_email(request: BillEmailRequest, background_tasks: BackgroundTasks):
+    # Get bill details
+    bill = await db.monthly_bills.find_one({"id": request.bill_id}, {"_id": 0})
+    if not bill:
+        raise HTTPException(status_code=404, detail="Bill not found")
+    
+    # Generate HTML content
+    month_name = MONTH_NAMES[bill["month"]]
+    html_content = BILL_EMAIL_TEMPLATE.render(bill=bill, month_name=month_name)
     
     if not resend.api_key:
         raise HTTPException(status_code=500, detail="Email service not configured")
@@ -684,23 +1100,11 @@ async def send_bill_email(request: BillEmailRequest):
         "html": html_content
     }
     
-    try:
-        email = await asyncio.to_thread(resend.Emails.send, params)
-        
-        # Update bill email status
-        await db.monthly_bills.update_one(
-            {"id": request.bill_id},
-            {"$set": {"email_sent": True}}
-        )
-        
-        return {
-            "status": "success",
-            "message": f"Bill sent to {request.recipient_email}",
-            "email_id": email.get("id")
-        }
-    except Exception as e:
-        logger.error(f"Failed to send bill email: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Failed to send email: {str(e)}")
+    background_tasks.add_task(deliver_email, params, request.bill_id)
+    return {
+        "status": "queued",
+        "message": f"Bill to {request.recipient_email} queued for delivery"
+    }
 
 # ==================== ROOT ROUTES ====================
 
@@ -715,6 +1119,62 @@ async def health_check():
 # Include the router in the main app
 app.include_router(api_router)
 
+# Conditional GETs for dashboard polling: tag the body and answer 304 when unchanged.
+# The tag is a content hash so it is the same across workers and restarts, and it
+# is checked whether the response came from the cache or not. Pure ASGI so the
+# other routes (and the streamed export) pass straight through.
+DASHBOARD_CACHE_CONTROL = "max-age=15, must-revalidate"
+
+class DashboardETagMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if (scope["type"] != "http" or scope["method"] != "GET"
+                or not scope["path"].startswith("/api/dashboard/")):
+            await self.app(scope, receive, send)
+            return
+
+        if_none_match = Headers(scope=scope).get("if-none-match", "")
+        start = None
+        body = []
+
+        async def send_tagged(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                if message["status"] == 200:
+                    start = message
+                else:
+                    await send(message)
+                return
+            if start is None:
+                await send(message)
+                return
+
+            body.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+
+            content = b"".join(body)
+            etag = f'"{hashlib.blake2b(content, digest_size=16).hexdigest()}"'
+            headers = MutableHeaders(scope=start)
+            headers["etag"] = etag
+            headers["cache-control"] = DASHBOARD_CACHE_CONTROL
+
+            if etag in [tag.strip() for tag in if_none_match.split(",")]:
+                del headers["content-length"]
+                del headers["content-type"]
+                await send({**start, "status": 304})
+                await send({"type": "http.response.body", "body": b""})
+                return
+
+            await send(start)
+            await send({"type": "http.response.body", "body": content})
+
+        await self.app(scope, receive, send_tagged)
+
+app.add_middleware(DashboardETagMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
@@ -722,7 +1182,3 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
-
-@app.on_event("shutdown")
-async def shutdown_db_client():
-    client.close()
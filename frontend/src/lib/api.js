@@ -0,0 +1,15 @@
+import axios from "axios";
+
+// List endpoints are cursor-paginated; follow next_cursor until the last page
+export async function fetchAllPages(url, params = {}) {
+  const items = [];
+  let after = null;
+  do {
+    const response = await axios.get(url, {
+      params: after ? { ...params, after } : params
+    });
+    items.push(...response.data.items);
+    after = response.data.next_cursor;
+  } while (after);
+  return items;
+}
@@ -75,7 +75,7 @@ export default function BillDetails() {
         bill_id: billId,
         recipient_email: recipientEmail
       });
-      toast.success("Bill sent successfully!");
+      toast.success("Bill email queued for delivery");
       setEmailDialogOpen(false);
       fetchBillDetails();
     } catch (error) {
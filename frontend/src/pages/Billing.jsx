@@ -1,5 +1,6 @@
 import { useState, useEffect } from "react";
 import axios from "axios";
+import { fetchAllPages } from "@/lib/api";
 import { toast } from "sonner";
 import { format } from "date-fns";
 import { useNavigate } from "react-router-dom";
@@ -81,10 +82,10 @@ export default function Billing() {
   const fetchBills = async () => {
     try {
       setLoading(true);
-      const response = await axios.get(
-        `${API}/billing/monthly?month=${selectedMonth}&year=${selectedYear}`
-      );
-      setBills(response.data);
+      setBills(await fetchAllPages(`${API}/billing/monthly`, {
+        month: selectedMonth,
+        year: selectedYear
+      }));
     } catch (error) {
       toast.error("Failed to load bills");
     } finally {
@@ -119,7 +120,7 @@ export default function Billing() {
         bill_id: selectedBill.id,
         recipient_email: recipientEmail
       });
-      toast.success("Bill sent successfully!");
+      toast.success("Bill email queued for delivery");
       setEmailDialogOpen(false);
       setRecipientEmail("");
       fetchBills();
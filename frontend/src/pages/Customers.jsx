@@ -1,5 +1,6 @@
 import { useState, useEffect } from "react";
 import axios from "axios";
+import { fetchAllPages } from "@/lib/api";
 import { toast } from "sonner";
 import {
   Plus,
@@ -66,8 +67,7 @@ export default function Customers() {
 
   const fetchCustomers = async () => {
     try {
-      const response = await axios.get(`${API}/customers`);
-      setCustomers(response.data);
+      setCustomers(await fetchAllPages(`${API}/customers`));
     } catch (error) {
       toast.error("Failed to load customers");
     } finally {
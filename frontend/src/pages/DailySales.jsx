@@ -1,5 +1,6 @@
 import { useState, useEffect } from "react";
 import axios from "axios";
+import { fetchAllPages } from "@/lib/api";
 import { toast } from "sonner";
 import { format } from "date-fns";
 import {
@@ -81,12 +82,12 @@ export default function DailySales() {
 
   const fetchInitialData = async () => {
     try {
-      const [customersRes, productsRes] = await Promise.all([
-        axios.get(`${API}/customers?active_only=true`),
-        axios.get(`${API}/products?active_only=true`)
+      const [customersData, productsData] = await Promise.all([
+        fetchAllPages(`${API}/customers`, { active_only: true }),
+        fetchAllPages(`${API}/products`, { active_only: true })
       ]);
-      setCustomers(customersRes.data);
-      setProducts(productsRes.data);
+      setCustomers(customersData);
+      setProducts(productsData);
     } catch (error) {
       toast.error("Failed to load data");
     }
@@ -96,8 +97,7 @@ export default function DailySales() {
     try {
       setLoading(true);
       const dateStr = format(selectedDate, "yyyy-MM-dd");
-      const response = await axios.get(`${API}/daily-sales?date=${dateStr}`);
-      setSales(response.data);
+      setSales(await fetchAllPages(`${API}/daily-sales`, { date: dateStr }));
     } catch (error) {
       toast.error("Failed to load sales");
     } finally {
@@ -152,7 +152,8 @@ export default function DailySales() {
       const payload = {
         customer_id: formData.customer_id,
         date: formData.date,
-        items: formData.items,
+        // Line totals are computed by the server
+        items: formData.items.map(({ total, ...item }) => item),
         paid_amount: parseFloat(formData.paid_amount) || 0
       };
 
@@ -1,5 +1,6 @@
 import { useState, useEffect } from "react";
 import axios from "axios";
+import { fetchAllPages } from "@/lib/api";
 import { toast } from "sonner";
 import {
   Plus,
@@ -31,6 +32,7 @@ import {
 } from "@/components/ui/table";
 
 const API = `${process.env.REACT_APP_BACKEND_URL}/api`;
+const RECENT_SALES_LIMIT = 10;
 
 export default function GuestSales() {
   const [recentSales, setRecentSales] = useState([]);
@@ -56,12 +58,12 @@ export default function GuestSales() {
 
   const fetchInitialData = async () => {
     try {
-      const [productsRes, salesRes] = await Promise.all([
-        axios.get(`${API}/products?active_only=true`),
-        axios.get(`${API}/guest-sales`)
+      const [productsData, salesRes] = await Promise.all([
+        fetchAllPages(`${API}/products`, { active_only: true }),
+        axios.get(`${API}/guest-sales`, { params: { limit: RECENT_SALES_LIMIT } })
       ]);
-      setProducts(productsRes.data);
-      setRecentSales(salesRes.data.slice(0, 10));
+      setProducts(productsData);
+      setRecentSales(salesRes.data.items);
     } catch (error) {
       toast.error("Failed to load data");
     } finally {
@@ -128,7 +130,8 @@ export default function GuestSales() {
       const payload = {
         guest_name: guestName || "Walk-in Customer",
         guest_phone: guestPhone,
-        items: cart,
+        // Line totals are computed by the server
+        items: cart.map(({ total, ...item }) => item),
         payment_method: paymentMethod
       };
 
@@ -142,8 +145,10 @@ export default function GuestSales() {
       setPaymentMethod("cash");
       
       // Refresh recent sales
-      const salesRes = await axios.get(`${API}/guest-sales`);
-      setRecentSales(salesRes.data.slice(0, 10));
+      const salesRes = await axios.get(`${API}/guest-sales`, {
+        params: { limit: RECENT_SALES_LIMIT }
+      });
+      setRecentSales(salesRes.data.items);
     } catch (error) {
       toast.error(error.response?.data?.detail || "Failed to complete sale");
     } finally {
@@ -1,5 +1,6 @@
 import { useState, useEffect } from "react";
 import axios from "axios";
+import { fetchAllPages } from "@/lib/api";
 import { toast } from "sonner";
 import {
   Plus,
@@ -69,8 +70,7 @@ export default function Products() {
 
   const fetchProducts = async () => {
     try {
-      const response = await axios.get(`${API}/products`);
-      setProducts(response.data);
+      setProducts(await fetchAllPages(`${API}/products`));
     } catch (error) {
       toast.error("Failed to load products");
     } finally {
@@ -0,0 +1,31 @@
+import sys
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends.inmemory import InMemoryBackend
+from mongomock_motor import AsyncMongoMockClient
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+import server  # noqa: E402
+
+
+@pytest.fixture
+def db(monkeypatch):
+    client = AsyncMongoMockClient()
+    database = client["lata_test"]
+    monkeypatch.setattr(server, "client", client)
+    monkeypatch.setattr(server, "db", database)
+    FastAPICache.reset()
+    InMemoryBackend._store.clear()
+    server.get_customer_ref.cache_clear()
+    return database
+
+
+@pytest.fixture
+def api(db):
+    with TestClient(server.app) as test_client:
+        yield test_client
+
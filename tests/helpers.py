@@ -0,0 +1,22 @@
+def make_product(api, name="Milk", price=50.0):
+    response = api.post("/api/products", json={
+        "name": name, "category": "milk", "unit": "liter", "price": price
+    })
+    assert response.status_code == 200
+    return response.json()
+
+
+def make_customer(api, name="Asha"):
+    response = api.post("/api/customers", json={"name": name, "phone": "9999999999", "address": "Main St"})
+    assert response.status_code == 200
+    return response.json()
+
+
+def sale_item(product, quantity=2):
+    return {
+        "product_id": product["id"],
+        "product_name": product["name"],
+        "quantity": quantity,
+        "unit": product["unit"],
+        "price": product["price"]
+    }
@@ -0,0 +1,54 @@
+from tests.helpers import make_customer, make_product, sale_item
+
+
+def add_sale(api, customer, product, date, quantity=1, paid_amount=0.0):
+    response = api.post("/api/daily-sales", json={
+        "customer_id": customer["id"], "date": date,
+        "items": [sale_item(product, quantity=quantity)], "paid_amount": paid_amount
+    })
+    assert response.status_code == 200
+
+
+def generate(api, month=4, year=2026):
+    response = api.post("/api/billing/generate", params={"month": month, "year": year})
+    assert response.status_code == 200
+    return {bill["customer_id"]: bill for bill in response.json()["bills"]}
+
+
+def test_generate_bills_totals_the_month(api):
+    product = make_product(api, price=30.0)
+    asha = make_customer(api, name="Asha")
+    ravi = make_customer(api, name="Ravi")
+    add_sale(api, asha, product, "2026-04-01", quantity=2, paid_amount=20.0)
+    add_sale(api, asha, product, "2026-04-30")
+    add_sale(api, asha, product, "2026-05-01")
+    add_sale(api, ravi, product, "2026-03-31")
+
+    bills = generate(api)
+
+    assert list(bills) == [asha["id"]]
+    assert bills[asha["id"]]["total_sales"] == 90.0
+    assert bills[asha["id"]]["total_paid"] == 20.0
+    assert bills[asha["id"]]["balance_due"] == 70.0
+    assert bills[asha["id"]]["sales_count"] == 2
+
+
+def test_regenerating_bills_keeps_existing_id(api):
+    product = make_product(api, price=30.0)
+    customer = make_customer(api)
+    add_sale(api, customer, product, "2026-04-01")
+    first = generate(api)[customer["id"]]
+
+    add_sale(api, customer, product, "2026-04-02")
+    second = generate(api)[customer["id"]]
+
+    assert second["id"] == first["id"]
+    assert second["total_sales"] == 60.0
+
+    stored = api.get(f"/api/billing/{first['id']}")
+    assert stored.status_code == 200
+    assert stored.json()["bill"]["total_sales"] == 60.0
+    assert len(stored.json()["sales"]) == 2
+
+    listed = api.get("/api/billing/monthly", params={"month": 4, "year": 2026}).json()["items"]
+    assert [bill["id"] for bill in listed] == [first["id"]]
@@ -0,0 +1,57 @@
+import fakeredis
+import pytest
+from fastapi.testclient import TestClient
+
+import server
+from tests.helpers import make_product
+
+
+@pytest.fixture
+def redis_api(db, monkeypatch):
+    redis_server = fakeredis.FakeServer()
+    monkeypatch.setattr(server, "REDIS_URL", "redis://cache")
+    monkeypatch.setattr(server.aioredis, "from_url", lambda url: fakeredis.FakeAsyncRedis(server=redis_server))
+    with TestClient(server.app) as test_client:
+        yield test_client, server.cache_redis
+    monkeypatch.setattr(server, "cache_redis", None)
+
+
+def test_writes_bump_namespace_generation_instead_of_scanning(redis_api):
+    api, redis = redis_api
+    make_product(api, name="Milk")
+    api.get("/api/product-categories")
+    assert api.get("/api/product-categories").headers["x-fastapi-cache"] == "HIT"
+
+    def no_scan(*args, **kwargs):
+        raise AssertionError("cache invalidation must not scan keys")
+    redis.keys = no_scan
+
+    make_product(api, name="Paneer")
+
+    assert api.get("/api/product-categories").headers["x-fastapi-cache"] == "MISS"
+    assert api.get("/api/product-categories").headers["x-fastapi-cache"] == "HIT"
+    assert int(api.portal.call(redis.get, "lata:products:generation")) == 2
+
+
+def test_invalidation_leaves_other_namespaces_cached(redis_api):
+    api, redis = redis_api
+    api.get("/api/product-categories")
+    api.get("/api/dashboard/stats")
+
+    api.post("/api/customers", json={"name": "Asha", "phone": "1", "address": "x"})
+
+    assert api.get("/api/product-categories").headers["x-fastapi-cache"] == "HIT"
+    assert api.get("/api/dashboard/stats").headers["x-fastapi-cache"] == "MISS"
+
+
+def test_redis_outage_does_not_fail_requests(redis_api, db, caplog):
+    api, redis = redis_api
+    redis.connection_pool.connection_kwargs["server"].connected = False
+
+    created = api.post("/api/customers", json={"name": "Asha", "phone": "1", "address": "x"})
+
+    assert created.status_code == 200
+    assert api.get("/api/dashboard/stats").status_code == 200
+    assert api.get("/api/product-categories").status_code == 200
+    assert "Failed to invalidate cache namespaces" in caplog.text
+    assert "Failed to read cache generation" in caplog.text
@@ -0,0 +1,55 @@
+from fastapi_cache.backends.inmemory import InMemoryBackend
+
+ORIGIN = {"Origin": "http://localhost:3000"}
+
+
+def test_dashboard_answers_304_for_matching_etag(api):
+    first = api.get("/api/dashboard/stats", headers=ORIGIN)
+    assert first.status_code == 200
+    assert first.headers["cache-control"] == "max-age=15, must-revalidate"
+    assert first.headers["access-control-allow-origin"]
+    etag = first.headers["etag"]
+
+    revalidated = api.get("/api/dashboard/stats", headers={"If-None-Match": etag, **ORIGIN})
+
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+    assert revalidated.headers["etag"] == etag
+    assert revalidated.headers["cache-control"] == "max-age=15, must-revalidate"
+    assert revalidated.headers["access-control-allow-origin"]
+
+
+def test_etag_matches_after_the_cached_entry_is_gone(api):
+    etag = api.get("/api/dashboard/stats").headers["etag"]
+    InMemoryBackend._store.clear()
+
+    revalidated = api.get("/api/dashboard/stats", headers={"If-None-Match": etag})
+
+    assert revalidated.headers["x-fastapi-cache"] == "MISS"
+    assert revalidated.status_code == 304
+
+
+def test_etag_is_a_stable_content_hash(api):
+    first = api.get("/api/dashboard/stats")
+    second = api.get("/api/dashboard/stats")
+
+    assert first.headers["etag"] == second.headers["etag"]
+    assert not first.headers["etag"].startswith("W/")
+
+
+def test_dashboard_changed_body_is_sent_again(api):
+    etag = api.get("/api/dashboard/stats").headers["etag"]
+
+    response = api.get("/api/dashboard/stats", headers={"If-None-Match": '"stale"'})
+
+    assert response.status_code == 200
+    assert response.headers["etag"] == etag
+    assert response.json()
+
+
+def test_other_routes_are_left_alone(api):
+    response = api.get("/api/products")
+
+    assert response.status_code == 200
+    assert "etag" not in response.headers
+    assert "cache-control" not in response.headers
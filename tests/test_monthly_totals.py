@@ -0,0 +1,145 @@
+import asyncio
+
+import pytest
+
+from fastapi.testclient import TestClient
+
+import server
+from tests.helpers import make_customer, make_product, sale_item
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def seed_sales(db):
+    run(db.customers.insert_many([{"id": "c1", "name": "Asha"}, {"id": "c2", "name": "Ravi"}]))
+    run(db.daily_sales.insert_many([
+        {"id": "s1", "customer_id": "c1", "date": "2026-03-01", "total_amount": 100.0},
+        {"id": "s2", "customer_id": "c1", "date": "2026-03-15", "total_amount": 50.0},
+        {"id": "s3", "customer_id": "c1", "date": "2026-04-02", "total_amount": 20.0},
+        {"id": "s4", "customer_id": "c2", "date": "2026-03-09", "total_amount": 30.0},
+    ]))
+
+
+def monthly_totals(db, customer_id):
+    return run(db.customers.find_one({"id": customer_id}))["monthly_totals"]
+
+
+def test_backfill_folds_existing_sales_into_months(db):
+    seed_sales(db)
+
+    with TestClient(server.app):
+        pass
+
+    assert monthly_totals(db, "c1") == {
+        "2026-03": {"total": 150.0, "count": 2},
+        "2026-04": {"total": 20.0, "count": 1},
+    }
+    assert monthly_totals(db, "c2") == {"2026-03": {"total": 30.0, "count": 1}}
+    assert run(db.migrations.find_one({"_id": "monthly_totals_backfill"}))["done"] is True
+
+
+def test_backfill_completes_partial_totals_without_marker(db):
+    seed_sales(db)
+    run(db.customers.update_one({"id": "c1"}, {"$set": {"monthly_totals.2026-03": {"total": 100.0, "count": 1}}}))
+
+    with TestClient(server.app):
+        pass
+
+    assert monthly_totals(db, "c1")["2026-03"] == {"total": 150.0, "count": 2}
+    assert monthly_totals(db, "c2") == {"2026-03": {"total": 30.0, "count": 1}}
+
+
+def test_backfill_runs_once(db):
+    seed_sales(db)
+    with TestClient(server.app):
+        pass
+    run(db.daily_sales.insert_one(
+        {"id": "s5", "customer_id": "c2", "date": "2026-03-10", "total_amount": 5.0}
+    ))
+
+    with TestClient(server.app):
+        pass
+
+    assert monthly_totals(db, "c2") == {"2026-03": {"total": 30.0, "count": 1}}
+
+
+def test_backfill_counts_sales_written_while_it_runs(db, monkeypatch):
+    seed_sales(db)
+    aggregate = server._monthly_totals
+    calls = []
+
+    async def with_old_worker_write(match):
+        totals = await aggregate(match)
+        if not calls:
+            # A worker on the previous version inserts a sale without $inc
+            await db.daily_sales.insert_one({
+                "id": "s5", "customer_id": "c2", "date": "2026-03-20",
+                "total_amount": 5.0, "created_at": server._now_iso()
+            })
+        calls.append(match)
+        return totals
+
+    monkeypatch.setattr(server, "_monthly_totals", with_old_worker_write)
+    with TestClient(server.app):
+        pass
+
+    assert monthly_totals(db, "c2") == {"2026-03": {"total": 35.0, "count": 2}}
+    assert monthly_totals(db, "c1")["2026-03"] == {"total": 150.0, "count": 2}
+
+
+def test_failed_backfill_releases_lease_for_retry(db, monkeypatch):
+    seed_sales(db)
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("mongo went away")
+
+    with monkeypatch.context() as patched:
+        patched.setattr(server, "UpdateOne", fail)
+        with pytest.raises(RuntimeError):
+            with TestClient(server.app):
+                pass
+
+    assert run(db.migrations.find_one({"_id": "monthly_totals_backfill"}))["done"] is False
+
+    with TestClient(server.app):
+        pass
+
+    assert monthly_totals(db, "c2") == {"2026-03": {"total": 30.0, "count": 1}}
+
+
+def test_sale_create_and_delete_keep_month_totals(api, db):
+    product = make_product(api, price=40.0)
+    customer = make_customer(api)
+    sales = [
+        api.post("/api/daily-sales", json={
+            "customer_id": customer["id"], "date": date, "items": [sale_item(product, quantity=1)]
+        }).json()
+        for date in ("2026-05-01", "2026-05-20", "2026-06-01")
+    ]
+
+    assert monthly_totals(db, customer["id"]) == {
+        "2026-05": {"total": 80.0, "count": 2},
+        "2026-06": {"total": 40.0, "count": 1},
+    }
+
+    assert api.delete(f"/api/daily-sales/{sales[1]['id']}").status_code == 200
+
+    assert monthly_totals(db, customer["id"]) == {
+        "2026-05": {"total": 40.0, "count": 1},
+        "2026-06": {"total": 40.0, "count": 1},
+    }
+
+
+def test_sale_date_must_be_a_calendar_date(api, db):
+    product = make_product(api)
+    customer = make_customer(api)
+
+    for date in ("2026-05", "2026-05-01.x", "2026-13-01", "$where-01-01", "2026-02-30"):
+        response = api.post("/api/daily-sales", json={
+            "customer_id": customer["id"], "date": date, "items": [sale_item(product)]
+        })
+        assert response.status_code == 422, date
+
+    assert run(db.customers.find_one({"id": customer["id"]})).get("monthly_totals") is None
@@ -0,0 +1,80 @@
+import base64
+
+import orjson
+
+from tests.helpers import make_customer, make_product, sale_item
+
+
+def fetch_all(api, url, **params):
+    pages = []
+    after = None
+    while True:
+        query = {**params, **({"after": after} if after else {})}
+        response = api.get(url, params=query)
+        assert response.status_code == 200
+        body = response.json()
+        pages.append(body["items"])
+        after = body["next_cursor"]
+        if after is None:
+            return pages
+
+
+def test_products_page_in_insertion_order(api):
+    created = [make_product(api, name=f"P{i}")["id"] for i in range(5)]
+
+    pages = fetch_all(api, "/api/products", limit=2)
+
+    assert [len(page) for page in pages] == [2, 2, 1]
+    assert [p["id"] for page in pages for p in page] == created
+
+
+def test_exact_multiple_of_limit_has_no_trailing_empty_page(api):
+    for i in range(4):
+        make_product(api, name=f"P{i}")
+
+    pages = fetch_all(api, "/api/products", limit=2)
+
+    assert [len(page) for page in pages] == [2, 2]
+
+
+def test_daily_sales_page_newest_date_first(api):
+    product = make_product(api)
+    customer = make_customer(api)
+    dates = ["2026-03-01", "2026-03-03", "2026-03-02", "2026-03-03"]
+    for date in dates:
+        response = api.post("/api/daily-sales", json={
+            "customer_id": customer["id"], "date": date, "items": [sale_item(product)]
+        })
+        assert response.status_code == 200
+
+    pages = fetch_all(api, "/api/daily-sales", limit=3)
+
+    assert [s["date"] for page in pages for s in page] == sorted(dates, reverse=True)
+
+
+def test_guest_sales_newest_first_in_one_request(api):
+    product = make_product(api)
+    created = [
+        api.post("/api/guest-sales", json={"items": [sale_item(product)]}).json()["id"]
+        for _ in range(3)
+    ]
+
+    body = api.get("/api/guest-sales", params={"limit": 2}).json()
+
+    assert [s["id"] for s in body["items"]] == created[::-1][:2]
+    assert body["next_cursor"] is not None
+
+
+def test_invalid_cursor_is_rejected(api):
+    response = api.get("/api/products", params={"after": "not-a-cursor"})
+
+    assert response.status_code == 400
+
+
+def test_cursor_with_operator_values_is_rejected(api):
+    make_product(api)
+
+    for values in ([{"$regex": ".*"}, ""], [{"$bogus": 1}, ""], [None, ""], [["a"], ""]):
+        cursor = base64.urlsafe_b64encode(orjson.dumps(values)).decode()
+        response = api.get("/api/products", params={"after": cursor})
+        assert response.status_code == 400, values